@@ -0,0 +1,93 @@
+# src/bench_gold_layout.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark de layouts de Gold: tamaño en disco, tiempo de escritura y latencia
+de las consultas KPI (DuckDB) para distintas configuraciones de write_gold_table.
+
+Uso:  python src/bench_gold_layout.py [--scale 200] [--repeat 5] [--out ruta.csv]
+(--scale replica las filas de Gold para simular volúmenes mayores; el CSV va a
+logs/ por defecto, fuera de reports/ que se gestiona con index.json + retención)
+"""
+import argparse, os, pathlib, tempfile, time
+import duckdb
+import pandas as pd
+from gold_store import gold_files, write_gold_table
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+GOLD_DIR = ROOT / "data" / "gold"
+LOG_DIR = ROOT / "logs"
+
+NO_LAYOUT = {"sort_by": [], "dictionary": False, "row_group_size": 1 << 20,
+             "compression": "snappy", "bloom_filter_cols": []}
+
+LAYOUTS = {
+    "pandas_default": None,  # df.to_parquet(index=False), como antes
+    "unsorted_snappy": NO_LAYOUT,
+    "clustered_zstd3": {"compression_level": 3, "bloom_filter_cols": []},
+    "clustered_zstd9": {"compression_level": 9, "bloom_filter_cols": []},
+    "clustered_zstd3_rg64k": {"compression_level": 3, "row_group_size": 65536, "bloom_filter_cols": []},
+    "clustered_zstd3_bloom": {"compression_level": 3, "bloom_filter_cols": ["school", "subject"]},
+}
+
+# KPIs representativos (mismos patrones que make_reports / query_kpis)
+QUERIES = {
+    "avg_by_school_subject": "SELECT school, subject, AVG(G3), COUNT(*) FROM gold GROUP BY school, subject",
+    "percentiles_by_subject": "SELECT subject, quantile_cont(G3, [0.1, 0.5, 0.9]) FROM gold GROUP BY subject",
+    "top10_by_subject": """
+        SELECT * FROM (
+          SELECT school, subject, G3,
+                 ROW_NUMBER() OVER (PARTITION BY subject ORDER BY G3 DESC, G2 DESC, G1 DESC) AS rk
+          FROM gold) WHERE rk <= 10""",
+    "filter_school_subject": "SELECT AVG(G3), COUNT(*) FROM gold WHERE subject = 'Math' AND school = 'MS'",
+}
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--scale", type=int, default=200, help="veces que se replica Gold")
+    ap.add_argument("--repeat", type=int, default=5, help="repeticiones por consulta (mejor tiempo)")
+    ap.add_argument("--out", default=None, help="CSV de resultados (por defecto logs/bench_gold_layout_<ts>.csv)")
+    args = ap.parse_args()
+
+    files = gold_files(GOLD_DIR)
+    if not files:
+        raise FileNotFoundError(f"No hay archivos Parquet en {GOLD_DIR}. Corre primero src/make_gold.py")
+    base = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    df = pd.concat([base] * args.scale, ignore_index=True)
+    print(f"Filas de prueba: {len(df)} (Gold x{args.scale})")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, layout in LAYOUTS.items():
+            path = os.path.join(tmp, f"{name}.parquet")
+            t0 = time.perf_counter()
+            if layout is None:
+                df.to_parquet(path, index=False)
+            else:
+                write_gold_table(df, path, layout)
+            write_s = time.perf_counter() - t0
+
+            con = duckdb.connect()
+            con.execute(f"CREATE VIEW gold AS SELECT * FROM read_parquet('{pathlib.Path(path).as_posix()}')")
+            row = {"layout": name, "size_kb": round(os.path.getsize(path) / 1024, 1), "write_ms": round(write_s * 1000, 1)}
+            for q_name, sql in QUERIES.items():
+                row[f"{q_name}_ms"] = round(best_of(lambda: con.execute(sql).fetchall(), args.repeat) * 1000, 2)
+            con.close()
+            rows.append(row)
+
+    result = pd.DataFrame(rows)
+    print(result.to_string(index=False))
+    out = pathlib.Path(args.out) if args.out else LOG_DIR / f"bench_gold_layout_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    result.to_csv(out, index=False, encoding="utf-8")
+    print(f"CSV → {out}")
+
+if __name__ == "__main__":
+    main()
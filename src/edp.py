@@ -0,0 +1,154 @@
+# src/edp.py
+# -*- coding: utf-8 -*-
+"""
+CLI única del pipeline:  python src/edp.py <comando>
+
+Comandos: gold, reports, dq, kpis, validate, export, serve, pipeline.
+Este módulo solo importa la librería estándar; pandas / duckdb / matplotlib /
+prefect se cargan recién cuando el comando los necesita (cada script corre
+en el mismo proceso con runpy, sin levantar otro intérprete).
+
+--importtime re-ejecuta el comando con `python -X importtime` y resume los
+paquetes que más tardan en importarse.
+"""
+import argparse, os, pathlib, re, runpy, subprocess, sys, time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+SCRIPTS = {
+    "gold": "make_gold.py",
+    "reports": "make_reports.py",
+    "dq": "run_dq.py",
+    "kpis": "query_kpis.py",
+    "validate": "validate_week3.py",
+    "export": "export_mongo.py",
+    "serve": "kpi_service.py",
+}
+
+def run_script(script: str) -> dict:
+    """Ejecuta un script de src/ en este proceso (cwd = raíz del repo) y devuelve sus globals."""
+    os.chdir(ROOT)
+    if str(SRC) not in sys.path:
+        sys.path.insert(0, str(SRC))
+    argv = sys.argv
+    sys.argv = [str(SRC / script)]
+    try:
+        return runpy.run_path(str(SRC / script), run_name="__main__")
+    finally:
+        sys.argv = argv
+
+def exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    return e.code if isinstance(e.code, int) else 1
+
+def cmd_script(args) -> int:
+    if getattr(args, "uniqueness", False):
+        os.environ["DQ_ENABLE_UNIQUENESS"] = "1"
+    if getattr(args, "workers", None) is not None:
+        os.environ["GOLD_WORKERS"] = str(args.workers)
+    if getattr(args, "port", None) is not None:
+        os.environ["KPI_PORT"] = str(args.port)
+    try:
+        run_script(SCRIPTS[args.command])
+    except SystemExit as e:
+        return exit_code(e)
+    return 0
+
+def cmd_pipeline(args) -> int:
+    """GOLD -> REPORTES -> DQ -> VALIDACIÓN, sin Prefect salvo que se pida --prefect."""
+    if args.prefect:
+        from flow_prefect import pipeline
+        print(pipeline(enable_uniqueness=args.uniqueness, stop_on_fail=not args.no_stop))
+        return 0
+
+    os.environ["DQ_ENABLE_UNIQUENESS"] = "1" if args.uniqueness else "0"
+    run_script(SCRIPTS["gold"])
+    run_script(SCRIPTS["reports"])
+    dq = run_script(SCRIPTS["dq"])
+    if dq.get("status") == "FAIL" and not args.no_stop:
+        print("Pipeline detenido por Data Quality FAIL", file=sys.stderr)
+        return 1
+    try:
+        run_script(SCRIPTS["validate"])
+    except SystemExit as e:
+        return exit_code(e)
+    return 0
+
+# =======================
+# -X importtime
+# =======================
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def run_with_importtime(argv: list, top: int = 10) -> int:
+    """Re-ejecuta edp con -X importtime y resume el costo de imports de primer nivel."""
+    cmd = [sys.executable, "-X", "importtime", str(pathlib.Path(__file__).resolve()), *argv]
+    # stdout sin buffer en el hijo: mantiene el orden relativo con stderr en CI
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True, bufsize=1, env=env)
+
+    # stderr línea a línea: warnings/tracebacks (y logs de `serve`) salen al momento;
+    # solo las líneas "import time:" se guardan para el resumen
+    top_level = []
+    try:
+        for line in proc.stderr:
+            m = IMPORTTIME_RE.match(line)
+            if not m:
+                if not line.startswith("import time:"):
+                    print(line, end="", file=sys.stderr, flush=True)
+                continue
+            _, cum_us, indent, name = m.groups()
+            if len(indent) == 1:  # import de primer nivel (no anidado)
+                top_level.append((int(cum_us), name))
+    except KeyboardInterrupt:
+        pass  # Ctrl+C también llega al hijo; se espera su salida y se imprime el resumen
+    proc.wait()
+    wall = time.perf_counter() - t0
+
+    total_ms = sum(us for us, _ in top_level) / 1000
+    print(f"\n=== importtime: {' '.join(argv)} ===", file=sys.stderr)
+    print(f"Imports (acumulado) : {total_ms:8.1f} ms", file=sys.stderr)
+    print(f"Proceso completo    : {wall * 1000:8.1f} ms", file=sys.stderr)
+    for us, name in sorted(top_level, reverse=True)[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}", file=sys.stderr)
+    return proc.returncode
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="edp", description="Edu Data Platform")
+    parser.add_argument("--importtime", action="store_true",
+                        help="mide el costo de imports del comando (python -X importtime)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_gold = sub.add_parser("gold", help="construye la capa Gold (make_gold.py)")
+    p_gold.add_argument("--workers", type=int, default=None,
+                        help="procesos para la ingesta paralela por fuente (0 = secuencial)")
+    p_gold.set_defaults(func=cmd_script)
+    sub.add_parser("reports", help="reporte diario (make_reports.py)").set_defaults(func=cmd_script)
+    p_dq = sub.add_parser("dq", help="Data Quality sobre Gold (run_dq.py)")
+    p_dq.add_argument("--uniqueness", action="store_true", help="activa la regla de unicidad")
+    p_dq.set_defaults(func=cmd_script)
+    sub.add_parser("kpis", help="KPIs CSV/HTML (query_kpis.py)").set_defaults(func=cmd_script)
+    sub.add_parser("validate", help="valida el último reporte (validate_week3.py)").set_defaults(func=cmd_script)
+    sub.add_parser("export", help="Gold + KPIs a MongoDB (export_mongo.py)").set_defaults(func=cmd_script)
+    p_serve = sub.add_parser("serve", help="servicio HTTP/JSON de KPIs (kpi_service.py)")
+    p_serve.add_argument("--port", type=int, default=None, help="puerto (por defecto KPI_PORT o 8765)")
+    p_serve.set_defaults(func=cmd_script)
+
+    p_pipe = sub.add_parser("pipeline", help="gold -> reports -> dq -> validate")
+    p_pipe.add_argument("--uniqueness", action="store_true", help="activa la regla de unicidad del DQ")
+    p_pipe.add_argument("--no-stop", action="store_true", help="no cortar el flujo si DQ=FAIL")
+    p_pipe.add_argument("--prefect", action="store_true", help="orquestar con Prefect (flow_prefect.py)")
+    p_pipe.set_defaults(func=cmd_pipeline)
+    return parser
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+    if args.importtime:
+        return run_with_importtime([a for a in argv if a != "--importtime"])
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
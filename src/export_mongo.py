@@ -0,0 +1,129 @@
+# src/export_mongo.py
+# -*- coding: utf-8 -*-
+"""
+Exporta Gold y las secciones KPI del último reporte a MongoDB (para dashboards).
+
+- Un solo MongoClient (pool de conexiones) compartido por varios hilos.
+- Escrituras por lotes con bulk_write(ordered=False) de ReplaceOne(upsert=True):
+  el _id incluye el ts del run, así re-ejecutar el mismo run no duplica documentos.
+- La colección `meta` guarda la última versión exportada de Gold y el último run
+  de KPIs: los dashboards filtran gold_students por meta.gold_students.latest_version
+  (MONGO_PRUNE_OLD=1 además borra las versiones anteriores).
+- MONGO_URI=mongomock:// usa mongomock (sin servidor) para pruebas locales
+  (pip install -r requirements-dev.txt).
+"""
+import os, pathlib, time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pyarrow.parquet as pq
+from gold_store import gold_files, read_gold_manifest
+from report_store import latest_run, read_manifest, read_section
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+GOLD_DIR = ROOT / "data" / "gold"
+REPORTS_DIR = ROOT / "reports"
+
+# === PARÁMETROS ===
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB = os.getenv("MONGO_DB", "edu_data_platform")
+BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", "1000"))
+POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", "4"))  # conexiones del pool = hilos de escritura
+PRUNE_OLD = os.getenv("MONGO_PRUNE_OLD", "0") == "1"   # borra versiones previas de Gold / KPIs
+GOLD_COLLECTION = "gold_students"
+KPI_COLLECTION = "kpi_sections"
+META_COLLECTION = "meta"
+
+def get_client():
+    if MONGO_URI.startswith("mongomock://"):
+        import mongomock
+        return mongomock.MongoClient()
+    from pymongo import MongoClient
+    return MongoClient(MONGO_URI, maxPoolSize=POOL_SIZE, serverSelectionTimeoutMS=5000)
+
+def write_batch(coll, docs) -> int:
+    """Upsert idempotente de un lote (no ordenado: un error no frena el resto del lote)."""
+    from pymongo import ReplaceOne
+    res = coll.bulk_write([ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in docs], ordered=False)
+    return res.upserted_count + res.matched_count
+
+def push(coll, batches) -> tuple:
+    """Envía los lotes en paralelo sobre el pool del cliente. Devuelve (docs, segundos)."""
+    t0 = time.perf_counter()
+    written = 0
+    pending = set()
+    with ThreadPoolExecutor(max_workers=POOL_SIZE) as pool:
+        for docs in batches:
+            pending.add(pool.submit(write_batch, coll, docs))
+            # ventana acotada de lotes en vuelo: no se materializa todo Gold en memoria
+            if len(pending) >= 2 * POOL_SIZE:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += sum(f.result() for f in done)
+        written += sum(f.result() for f in pending)
+    return written, time.perf_counter() - t0
+
+def gold_batches(version: str):
+    """Lotes de documentos Gold, leídos por batches de Arrow (sin cargar todo en memoria)."""
+    for path in gold_files(GOLD_DIR):
+        rel = pathlib.Path(path).relative_to(GOLD_DIR).as_posix()
+        partition = pathlib.Path(rel).parent.as_posix()
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_SIZE):
+            docs = batch.to_pylist()
+            for i, d in enumerate(docs, start=offset):
+                d["_id"] = f"{version}:{rel}:{i}"
+                d["gold_version"] = version
+                d["partition"] = "" if partition == "." else partition
+            offset += len(docs)
+            yield docs
+
+def kpi_batches(ts: str, manifest: dict):
+    for section, entry in manifest["sections"].items():
+        rows = read_section(REPORTS_DIR, entry).to_pylist()
+        docs = [{"_id": f"{ts}:{section}:{i}", "run_ts": ts, "section": section, **r} for i, r in enumerate(rows)]
+        for start in range(0, len(docs), BATCH_SIZE):
+            yield docs[start:start + BATCH_SIZE]
+
+def publish(db, collection: str, field: str, value: str, docs: int) -> None:
+    """Marca `value` como la versión vigente de `collection` (y opcionalmente poda las previas)."""
+    db[META_COLLECTION].replace_one(
+        {"_id": collection},
+        {"_id": collection, "latest_version": value, "version_field": field, "docs": docs,
+         "exported_at": datetime.now().isoformat(timespec="seconds")},
+        upsert=True,
+    )
+    if PRUNE_OLD:
+        res = db[collection].delete_many({field: {"$ne": value}})
+        print(f"  {collection:<15}: {res.deleted_count} docs de versiones previas eliminados")
+
+def report(name, n, secs):
+    rate = n / secs if secs > 0 else float("inf")
+    print(f"  {name:<15}: {n:>8} docs en {secs:6.2f} s  ({rate:,.0f} docs/s)")
+
+def main():
+    client = get_client()
+    db = client[MONGO_DB]
+    print(f"MongoDB: {MONGO_URI} / {MONGO_DB} (batch={BATCH_SIZE}, pool={POOL_SIZE})")
+
+    # 1) Gold (ts = versión del manifest de Gold)
+    gold_version = read_gold_manifest(GOLD_DIR).get("version", "legacy")
+    gold = db[GOLD_COLLECTION]
+    gold.create_index([("gold_version", 1), ("subject", 1), ("school", 1)])
+    n, secs = push(gold, gold_batches(gold_version))
+    report(GOLD_COLLECTION, n, secs)
+    publish(db, GOLD_COLLECTION, "gold_version", gold_version, n)
+
+    # 2) Secciones KPI del último reporte (ts = run del reporte)
+    ts, run = latest_run(REPORTS_DIR)
+    if run.get("manifest"):
+        kpis = db[KPI_COLLECTION]
+        kpis.create_index([("run_ts", 1), ("section", 1)])
+        n, secs = push(kpis, kpi_batches(ts, read_manifest(REPORTS_DIR / run["manifest"])))
+        report(KPI_COLLECTION, n, secs)
+        publish(db, KPI_COLLECTION, "run_ts", ts, n)
+    else:
+        print(f"  {KPI_COLLECTION:<15}: sin manifest de reporte (corre primero src/make_reports.py)")
+
+    client.close()
+
+if __name__ == "__main__":
+    main()
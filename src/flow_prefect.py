@@ -4,6 +4,7 @@ import os, subprocess, sys, pathlib, datetime
 from prefect import flow, task, get_run_logger
 from prefect.tasks import task_input_hash
 from typing import Optional
+from report_store import latest_run
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
@@ -12,6 +13,11 @@ LOGS = ROOT / "logs"
 
 PY = sys.executable  # python actual
 
+def latest_report_html() -> str:
+    """HTML del último run según reports/index.json (sin escanear el directorio)."""
+    _, run = latest_run(REPORTS)
+    return str(REPORTS / run["html"]) if run.get("html") else ""
+
 def run_py(script: str, *args: str) -> None:
     """Ejecuta un script Python como subproceso y falla si sale != 0."""
     cmd = [PY, str(SRC / script), *args]
@@ -27,12 +33,12 @@ def step_make_gold() -> None:
     logger.info("OK GOLD")
 
 @task(retries=2, retry_delay_seconds=10)
-def step_make_reports() -> pathlib.Path:
+def step_make_reports() -> str:
     logger = get_run_logger()
     logger.info("Generating reports (CSV/HTML/PNG)...")
     run_py("make_reports.py")
     # devuelve el último HTML generado
-    latest = max(REPORTS.glob("report_daily_*.html"), key=lambda p: p.stat().st_mtime)
+    latest = latest_report_html()
     logger.info(f"Reports done: {latest}")
     return latest
 
@@ -72,8 +78,7 @@ def pipeline(enable_uniqueness: bool = False, stop_on_fail: bool = True) -> dict
     return {
         "dq_status": dq_res["status"],
         "runs_log": dq_res["runs_log"],
-        "last_report_html": str(max(REPORTS.glob("report_daily_*.html"), key=lambda p: p.stat().st_mtime))
-            if REPORTS.exists() else "",
+        "last_report_html": latest_report_html() if REPORTS.exists() else "",
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+# src/gold_store.py
+# -*- coding: utf-8 -*-
+"""
+Manifest de la capa Gold (data/gold/_manifest.json).
+
+make_gold.py escribe primero los Parquet y al final "commitea" el manifest
+(escritura atómica) con la lista de archivos vigentes. Los lectores usan
+gold_files() y así nunca mezclan archivos de un build a medio escribir con
+los del build anterior.
+
+write_gold_table() aplica el layout de escritura de Gold (orden, row groups,
+diccionarios, compresión, bloom filters), configurable por entorno.
+"""
+import json, os, pathlib
+from datetime import datetime
+
+MANIFEST_NAME = "_manifest.json"
+
+def _csv_env(name: str, default: str) -> list:
+    return [c.strip() for c in os.getenv(name, default).split(",") if c.strip()]
+
+# Layout por defecto: agrupa por (subject, school) -los filtros/grupos de los KPIs-
+# y deja G3 descendente dentro de cada grupo para el ranking.
+# Columnas con prefijo "-" se ordenan en forma descendente.
+GOLD_LAYOUT = {
+    "sort_by": _csv_env("GOLD_SORT_BY", "subject,school,-G3"),
+    "dictionary": os.getenv("GOLD_DICTIONARY", "1") == "1",  # strings -> dictionary<string>
+    "row_group_size": int(os.getenv("GOLD_ROW_GROUP_SIZE", "131072")),
+    "compression": os.getenv("GOLD_COMPRESSION", "zstd"),
+    "compression_level": int(os.getenv("GOLD_ZSTD_LEVEL", "3")),
+    "bloom_filter_cols": _csv_env("GOLD_BLOOM_COLS", "school,subject") if os.getenv("GOLD_BLOOM", "0") == "1" else [],
+}
+
+def read_gold_manifest(gold_dir) -> dict:
+    path = pathlib.Path(gold_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def gold_files(gold_dir) -> list:
+    """Parquet vigentes según el manifest; sin manifest, todos los .parquet (recursivo)."""
+    gold_dir = pathlib.Path(gold_dir)
+    manifest = read_gold_manifest(gold_dir)
+    if manifest.get("files"):
+        return [str(gold_dir / f["path"]) for f in manifest["files"]]
+    return sorted(str(p) for p in gold_dir.rglob("*.parquet"))
+
+def commit_gold_manifest(gold_dir, version: str, files: list) -> pathlib.Path:
+    """
+    Publica el build `version` (files: [{"path", "rows", ...}] relativos a gold_dir)
+    y luego elimina los Parquet del build anterior (solo los que listaba el manifest
+    previo: otros .parquet en data/gold/ no se tocan).
+    """
+    gold_dir = pathlib.Path(gold_dir)
+    previous = read_gold_manifest(gold_dir).get("files", [])
+    doc = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "rows": sum(f["rows"] for f in files),
+        "files": sorted(files, key=lambda f: f["path"]),
+    }
+    path = gold_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+    keep = {(gold_dir / f["path"]).resolve() for f in files}
+    for f in previous:
+        p = gold_dir / f["path"]
+        if p.resolve() in keep or not p.exists():
+            continue
+        p.unlink()
+        if p.parent != gold_dir and not any(p.parent.iterdir()):
+            p.parent.rmdir()  # partición subject=... que quedó vacía
+    return path
+
+def write_gold_table(df, path, layout: dict = None) -> int:
+    """Escribe un DataFrame de Gold con el layout indicado (por defecto GOLD_LAYOUT)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    layout = {**GOLD_LAYOUT, **(layout or {})}
+    sort_keys = [
+        (c.lstrip("-"), "descending" if c.startswith("-") else "ascending")
+        for c in layout["sort_by"] if c.lstrip("-") in df.columns
+    ]
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    # Gold leído de vuelta trae categóricas (dictionary<...>): sort_by no las soporta,
+    # se decodifican a sus valores y el layout vuelve a aplicar el diccionario
+    for i, field in enumerate(tbl.schema):
+        if pa.types.is_dictionary(field.type):
+            tbl = tbl.set_column(i, field.name, tbl.column(i).cast(field.type.value_type))
+    if sort_keys:
+        tbl = tbl.sort_by(sort_keys)
+    if layout["dictionary"]:
+        for i, field in enumerate(tbl.schema):
+            if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                tbl = tbl.set_column(i, field.name, tbl.column(i).dictionary_encode())
+
+    kwargs = {}
+    bloom = [c for c in layout["bloom_filter_cols"] if c in tbl.column_names]
+    if bloom:  # requiere pyarrow con soporte de bloom filters en escritura
+        kwargs["bloom_filter_options"] = {c: {"ndv": max(tbl.num_rows, 1), "fpp": 0.05} for c in bloom}
+    if sort_keys:
+        kwargs["sorting_columns"] = pq.SortingColumn.from_ordering(tbl.schema, sort_keys)
+
+    pq.write_table(
+        tbl, path,
+        row_group_size=layout["row_group_size"],
+        compression=layout["compression"],
+        compression_level=layout["compression_level"] if layout["compression"] in ("zstd", "gzip", "brotli") else None,
+        use_dictionary=True,
+        **kwargs,
+    )
+    return tbl.num_rows
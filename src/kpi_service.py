@@ -0,0 +1,227 @@
+# src/kpi_service.py
+# -*- coding: utf-8 -*-
+"""
+Servicio local de KPIs (HTTP/JSON) sobre la capa Gold.
+
+  python src/kpi_service.py            (o: python src/edp.py serve)
+  GET /kpis                                   -> KPIs disponibles
+  GET /kpis/avg_by_school_subject?subject=Math&school=GP
+  GET /kpis/top_n?subject=Portuguese&n=5
+  GET /health                                 -> versión de Gold + estado del cache
+
+- Una conexión DuckDB "caliente" con la vista `gold`; cada request usa un cursor
+  de un pool (requests concurrentes sin abrir conexiones nuevas).
+- Resultados en un cache LRU cuya clave incluye la huella de Gold: si el
+  manifest (o los Parquet) cambian, la vista se recrea y el cache se vacía.
+"""
+import json, math, os, pathlib, queue, threading, time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import duckdb
+from gold_store import MANIFEST_NAME, gold_files
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+GOLD_DIR = ROOT / "data" / "gold"
+
+# === PARÁMETROS ===
+HOST = os.getenv("KPI_HOST", "127.0.0.1")
+PORT = int(os.getenv("KPI_PORT", "8765"))
+CURSORS = int(os.getenv("KPI_CURSORS", "4"))        # tamaño del pool de cursores
+CACHE_SIZE = int(os.getenv("KPI_CACHE_SIZE", "256"))  # entradas del LRU
+MAX_TOP_N = 100
+
+# =======================
+# KPIs (SQL parametrizado)
+# =======================
+# {where} se reemplaza por los filtros (subject / school) con parámetros "?"
+KPIS = {
+    "avg_by_school_subject": """
+        SELECT school, subject,
+               ROUND(AVG(G3), 2)    AS avg_g3,
+               COUNT(*)             AS n,
+               ROUND(STDDEV(G3), 2) AS stddev_g3
+        FROM gold {where}
+        GROUP BY school, subject
+        ORDER BY school, subject""",
+    "correlations": """
+        SELECT corr(G1, G3) AS corr_g1_g3,
+               corr(G2, G3) AS corr_g2_g3,
+               corr(G1, G2) AS corr_g1_g2,
+               COUNT(*)     AS n
+        FROM gold {where}""",
+    "percentiles": """
+        SELECT subject,
+               quantile_cont(G3, 0.10) AS p10,
+               quantile_cont(G3, 0.25) AS p25,
+               quantile_cont(G3, 0.50) AS p50,
+               quantile_cont(G3, 0.75) AS p75,
+               quantile_cont(G3, 0.90) AS p90,
+               COUNT(*)                AS n
+        FROM gold {where}
+        GROUP BY subject
+        ORDER BY subject""",
+    "top_n": """
+        SELECT * FROM (
+          SELECT school, sex, age, subject, G1, G2, G3,
+                 ROW_NUMBER() OVER (PARTITION BY subject ORDER BY G3 DESC, G2 DESC, G1 DESC) AS rk
+          FROM gold {where}
+        ) WHERE rk <= ?
+        ORDER BY subject, rk""",
+}
+FILTERS = ("subject", "school")
+
+def build_query(name: str, params: dict):
+    """SQL + parámetros de un KPI. Lanza KeyError (KPI) o ValueError (parámetros)."""
+    sql = KPIS[name]
+    unknown = set(params) - set(FILTERS) - ({"n"} if name == "top_n" else set())
+    if unknown:
+        raise ValueError(f"Parámetros no soportados: {sorted(unknown)}")
+    conds, args = [], []
+    for col in FILTERS:
+        if col in params:
+            conds.append(f"{col} = ?")
+            args.append(params[col])
+    where = ("WHERE " + " AND ".join(conds)) if conds else ""
+    if name == "top_n":
+        n = int(params.get("n", 10))
+        if not 1 <= n <= MAX_TOP_N:
+            raise ValueError(f"n debe estar entre 1 y {MAX_TOP_N}")
+        args.append(n)
+    return sql.format(where=where), args
+
+# =======================
+# Gold: conexión, huella, cache
+# =======================
+class KpiStore:
+    def __init__(self, gold_dir: pathlib.Path, cursors: int, cache_size: int):
+        self.gold_dir = gold_dir
+        self.con = duckdb.connect(database=":memory:")
+        self.cursors = queue.Queue()
+        for _ in range(cursors):
+            self.cursors.put(self.con.cursor())
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.fingerprint = None
+        self.hits = self.misses = 0
+
+    def current_fingerprint(self):
+        """Huella barata de Gold: stat del manifest, o de los Parquet si no hay manifest."""
+        manifest = self.gold_dir / MANIFEST_NAME
+        paths = [manifest] if manifest.exists() else [pathlib.Path(p) for p in gold_files(self.gold_dir)]
+        return tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in paths)
+
+    def refresh(self):
+        """Recrea la vista `gold` y vacía el cache si la huella de Gold cambió."""
+        fp = self.current_fingerprint()
+        if fp == self.fingerprint:
+            return fp
+        with self.lock:
+            if fp != self.fingerprint:
+                files = [pathlib.Path(f).as_posix().replace("'", "''") for f in gold_files(self.gold_dir)]
+                if not files:
+                    raise FileNotFoundError(f"No hay archivos Parquet en {self.gold_dir}")
+                file_list = ", ".join(f"'{f}'" for f in files)
+                self.con.execute(f"CREATE OR REPLACE VIEW gold AS SELECT * FROM read_parquet([{file_list}])")
+                self.cache.clear()
+                self.fingerprint = fp
+        return fp
+
+    def query(self, name: str, params: dict) -> dict:
+        sql, args = build_query(name, params)
+        fp = self.refresh()
+        key = (fp, name, tuple(sorted(params.items())))
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return {**self.cache[key], "cached": True}
+            self.misses += 1
+
+        cur = self.cursors.get()
+        try:
+            cur.execute(sql, args)
+            cols = [d[0] for d in cur.description]
+            rows = [
+                {c: (None if isinstance(v, float) and math.isnan(v) else v) for c, v in zip(cols, r)}
+                for r in cur.fetchall()
+            ]
+        finally:
+            self.cursors.put(cur)
+
+        result = {"kpi": name, "params": params, "rows": rows}
+        with self.lock:
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return {**result, "cached": False}
+
+    def health(self) -> dict:
+        fp = self.refresh()
+        return {
+            "gold_fingerprint": [list(x) for x in fp],
+            "gold_files": len(gold_files(self.gold_dir)),
+            "cache_entries": len(self.cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+# =======================
+# HTTP
+# =======================
+class Handler(BaseHTTPRequestHandler):
+    store: KpiStore = None
+
+    def send_json(self, status: int, doc: dict):
+        body = json.dumps(doc, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        t0 = time.perf_counter()
+        try:
+            if parts == ["health"]:
+                return self.send_json(200, self.store.health())
+            if parts == ["kpis"]:
+                return self.send_json(200, {"kpis": sorted(KPIS), "filters": list(FILTERS)})
+            if len(parts) == 2 and parts[0] == "kpis":
+                if parts[1] not in KPIS:
+                    return self.send_json(404, {"error": f"KPI desconocido: {parts[1]}", "kpis": sorted(KPIS)})
+                doc = self.store.query(parts[1], params)
+                doc["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+                return self.send_json(200, doc)
+            return self.send_json(404, {"error": "Ruta no encontrada"})
+        except ValueError as e:
+            return self.send_json(400, {"error": str(e)})
+        except (duckdb.Error, FileNotFoundError) as e:
+            return self.send_json(500, {"error": str(e)})
+
+    def log_message(self, fmt, *args):
+        print(f"[kpi] {self.address_string()} {fmt % args}")
+
+class KpiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # backlog mayor que el default (5) para ráfagas del dashboard
+
+def main():
+    Handler.store = KpiStore(GOLD_DIR, CURSORS, CACHE_SIZE)
+    Handler.store.refresh()
+    server = KpiServer((HOST, PORT), Handler)
+    print(f"KPI service en http://{HOST}:{PORT}  (cursores={CURSORS}, cache={CACHE_SIZE})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
-import os, zipfile, pathlib
+import os, re, hashlib, zipfile, pathlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 import pandas as pd
 from glob import glob
+from gold_store import commit_gold_manifest, write_gold_table
 
 BASE = "."
 RAW_DIR  = os.path.join(BASE, "data", "raw")
@@ -11,6 +14,12 @@ ZIP_PATH = os.path.join(RAW_DIR, "student_performance.zip")
 os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(GOLD_DIR, exist_ok=True)
 
+# Ingesta paralela: GOLD_WORKERS > 0 procesa cada fuente en un proceso aparte y
+# escribe su shard directo en data/gold/subject=<subject>/ (0 = modo secuencial).
+GOLD_WORKERS = int(os.getenv("GOLD_WORKERS", "0"))
+
+NUMERIC_COLS = ["G1","G2","G3","absences","age"]
+
 UCI_URLS = {
     "Math": "https://archive.ics.uci.edu/ml/machine-learning-databases/00320/student-mat.csv",
     "Portuguese": "https://archive.ics.uci.edu/ml/machine-learning-databases/00320/student-por.csv",
@@ -30,17 +39,23 @@ def list_found_csvs(root):
             print(f"  - {p}  ({size} bytes)")
     return csvs
 
-def pick_candidates(csv_paths):
-    patterns_math = ("mat", "math", "matematic")
-    patterns_por  = ("por", "portug")
+PATTERNS_MATH = ("mat", "math", "matematic")
+PATTERNS_POR  = ("por", "portug")
 
+def guess_subject(path):
+    low = os.path.basename(path).lower()
+    if any(k in low for k in PATTERNS_MATH): return "Math"
+    if any(k in low for k in PATTERNS_POR):  return "Portuguese"
+    return None
+
+def pick_candidates(csv_paths):
     math = None
     por  = None
     for p in csv_paths:
         low = os.path.basename(p).lower()
-        if any(k in low for k in patterns_math) and math is None:
+        if any(k in low for k in PATTERNS_MATH) and math is None:
             math = p
-        if any(k in low for k in patterns_por) and por is None:
+        if any(k in low for k in PATTERNS_POR) and por is None:
             por = p
 
     if math and por:
@@ -52,11 +67,6 @@ def pick_candidates(csv_paths):
         print(" No se detectó por nombre. Fallback (2 CSV más grandes):")
         print("   ", cand1)
         print("   ", cand2)
-        def guess_subject(path):
-            low = os.path.basename(path).lower()
-            if any(k in low for k in patterns_math): return "Math"
-            if any(k in low for k in patterns_por):  return "Portuguese"
-            return None
         s1, s2 = guess_subject(cand1), guess_subject(cand2)
         return (cand1, cand2, s1, s2)
 
@@ -68,7 +78,19 @@ def read_uci_csv(path_or_url):
     except UnicodeDecodeError:
         return pd.read_csv(path_or_url, sep=";", encoding="latin-1")
 
-def build_gold():
+def to_numeric_cols(df):
+    # Tipos numéricos clave
+    for c in NUMERIC_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+def resolve_sources(all_csvs=False):
+    """
+    Lista de fuentes (ruta o URL, subject, copia RAW opcional).
+    all_csvs=True (modo paralelo): cada CSV encontrado es una fuente, con subject
+    inferido por nombre; si no, el selector legacy de 2 archivos (Math / Portuguese).
+    """
     csvs = []
     if os.path.exists(ZIP_PATH):
         print(f" Asegurando extracción desde ZIP en: {RAW_DIR}")
@@ -82,45 +104,92 @@ def build_gold():
     # Si no hay ZIP o no hay CSV tras extraer, traemos directo desde UCI
     if not csvs:
         print(" No hay ZIP o no se hallaron CSV. Leyendo directo desde UCI…")
-        frames = []
-        for subj, url in UCI_URLS.items():
-            df = read_uci_csv(url)
-            df["subject"] = subj
-            # guardamos copia RAW para trazabilidad
-            raw_out = os.path.join(RAW_DIR, f"student_{subj.lower()}.csv")
-            df.to_csv(raw_out, index=False, encoding="utf-8")
-            frames.append(df)
+        # guardamos copia RAW para trazabilidad
+        return [
+            (url, subj, os.path.join(RAW_DIR, f"student_{subj.lower()}.csv"))
+            for subj, url in UCI_URLS.items()
+        ]
+
+    if all_csvs:
+        sources = []
+        for path in sorted(csvs):
+            subj = guess_subject(path)
+            if subj is None:
+                print(f" ⚠ Omitido (subject no reconocido por nombre): {path}")
+                continue
+            sources.append((path, subj, None))
+        if not sources:
+            raise FileNotFoundError("Ningún CSV de data\\raw tiene un subject reconocible por nombre.")
+        return sources
+
+    picked = pick_candidates(csvs)
+    subj_map = {}
+    if len(picked) == 2:
+        math_csv, por_csv = picked
+        subj_map = {math_csv: "Math", por_csv: "Portuguese"}
     else:
-        picked = pick_candidates(csvs)
-        subj_map = {}
-        if len(picked) == 2:
-            math_csv, por_csv = picked
-            subj_map = {math_csv: "Math", por_csv: "Portuguese"}
-        else:
-            cand1, cand2, s1, s2 = picked
-            subj_map[cand1] = s1 if s1 else "Math"
-            subj_map[cand2] = s2 if s2 else "Portuguese"
-            if not s1 or not s2:
-                print(" Asignación por defecto de subjects (revisa si es necesario cambiar):")
-                for k, v in subj_map.items():
-                    print(f"   {os.path.basename(k)} -> {v}")
-
-        frames = []
-        for path, subj in subj_map.items():
-            df = read_uci_csv(path)
-            df["subject"] = subj
-            frames.append(df)
-
-    all_df = pd.concat(frames, ignore_index=True)
+        cand1, cand2, s1, s2 = picked
+        subj_map[cand1] = s1 if s1 else "Math"
+        subj_map[cand2] = s2 if s2 else "Portuguese"
+        if not s1 or not s2:
+            print(" Asignación por defecto de subjects (revisa si es necesario cambiar):")
+            for k, v in subj_map.items():
+                print(f"   {os.path.basename(k)} -> {v}")
+    return [(path, subj, None) for path, subj in subj_map.items()]
+
+def read_source(src, subj, raw_out=None):
+    df = read_uci_csv(src)
+    df["subject"] = subj
+    if raw_out:
+        df.to_csv(raw_out, index=False, encoding="utf-8")
+    return df
+
+def build_shard(src, subj, raw_out, version):
+    """Worker: parsea y tipa UNA fuente y escribe su shard Parquet. Devuelve metadata."""
+    df = to_numeric_cols(read_source(src, subj, raw_out))
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", os.path.splitext(os.path.basename(src))[0])
+    # hash de la ruta completa: mismos nombres en carpetas distintas no se pisan
+    src_hash = hashlib.sha1(str(src).encode("utf-8")).hexdigest()[:8]
+    rel = f"subject={subj}/part-{stem}-{src_hash}-{version}.parquet"
+    out_path = os.path.join(GOLD_DIR, rel)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    write_gold_table(df, out_path)
+    return {"path": rel, "rows": len(df), "subject": subj, "source": str(src)}
+
+def build_gold_parallel(sources, version, workers):
+    """Un shard por fuente en un pool de procesos; el padre solo junta metadata."""
+    shards = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_shard, src, subj, raw_out, version) for src, subj, raw_out in sources]
+        for fut in as_completed(futures):
+            meta = fut.result()
+            print(f"  shard {meta['path']} ({meta['rows']} filas)")
+            shards.append(meta)
+    return shards
 
-    # Tipos numéricos clave
-    for c in ["G1","G2","G3","absences","age"]:
-        if c in all_df.columns:
-            all_df[c] = pd.to_numeric(all_df[c], errors="coerce")
+def build_gold():
+    sources = resolve_sources(all_csvs=GOLD_WORKERS > 0)
+    version = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    out_path = os.path.join(GOLD_DIR, "student_all.parquet")
-    all_df.to_parquet(out_path, index=False)
-    print(f" Gold listo: {out_path} ({len(all_df)} filas, {len(all_df.columns)} columnas)")
+    if GOLD_WORKERS > 0:
+        print(f" Ingesta paralela: {len(sources)} fuentes, {GOLD_WORKERS} procesos")
+        files = build_gold_parallel(sources, version, GOLD_WORKERS)
+        out_path = os.path.join(GOLD_DIR, "subject=*")
+    else:
+        frames = [read_source(src, subj, raw_out) for src, subj, raw_out in sources]
+        all_df = to_numeric_cols(pd.concat(frames, ignore_index=True))
+        # archivo nuevo por build: el vigente (según el manifest) no se toca hasta el commit
+        out_name = f"student_all-{version}.parquet"
+        out_path = os.path.join(GOLD_DIR, out_name)
+        tmp_path = out_path + ".tmp"
+        write_gold_table(all_df, tmp_path)
+        os.replace(tmp_path, out_path)
+        files = [{"path": out_name, "rows": len(all_df)}]
+
+    # Commit: el manifest publica el build y limpia los archivos del build anterior
+    manifest = commit_gold_manifest(GOLD_DIR, version, files)
+    rows = sum(f["rows"] for f in files)
+    print(f" Gold listo: {out_path} ({rows} filas, {len(files)} archivo(s)) — manifest {manifest}")
 
 if __name__ == "__main__":
     build_gold()
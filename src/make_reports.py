@@ -1,10 +1,13 @@
 # src/make_reports.py
 # -*- coding: utf-8 -*-
-import os, glob, textwrap, pathlib
+import os, textwrap, pathlib
 from datetime import datetime
 import duckdb
 import pandas as pd
 import matplotlib.pyplot as plt
+import pyarrow as pa
+from report_store import write_sections, write_manifest, register_run, apply_retention
+from gold_store import gold_files
 
 # Rutas base
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -12,6 +15,12 @@ GOLD_DIR = PROJECT_ROOT / "data" / "gold"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# CSV ancho consolidado (legacy): solo si REPORT_WIDE_CSV=1
+WRITE_WIDE_CSV = os.getenv("REPORT_WIDE_CSV", "0") == "1"
+# Retención: runs que se conservan en reports/ (el resto va a reports/archive/ o se borra)
+KEEP_RUNS = int(os.getenv("REPORTS_KEEP_RUNS", "30"))
+RETENTION_MODE = os.getenv("REPORTS_RETENTION", "archive")  # archive | delete
+
 # Timestamp y salidas
 ts = datetime.now().strftime("%Y%m%d_%H%M%S")
 csv_path = REPORTS_DIR / f"report_daily_{ts}.csv"
@@ -21,22 +30,14 @@ html_path = REPORTS_DIR / f"report_daily_{ts}.html"
 print(f"cwd: {os.getcwd()}")
 print(f"GOLD_DIR: {GOLD_DIR}")
 
-# Buscar .parquet (recursivo y plano)
-patterns = [str(GOLD_DIR / "**" / "*.parquet"), str(GOLD_DIR / "*.parquet")]
-files = []
-for pat in patterns:
-    found = glob.glob(pat, recursive=True)
-    if found:
-        files.extend(found)
-
-# Normalizar y deduplicar rutas
-files = sorted(set([str(pathlib.Path(f)) for f in files]))
+# Parquet vigentes de Gold (manifest; sin manifest, búsqueda recursiva)
+files = gold_files(GOLD_DIR)
 
 if not files:
     raise FileNotFoundError(textwrap.dedent(f"""
     No se encontraron Parquet.
-      - Buscado: {patterns[0]} y {patterns[1]}
-      - Verifica que exista: {GOLD_DIR}\\student_all.parquet
+      - Buscado: {GOLD_DIR} (manifest o **/*.parquet)
+      - Verifica {GOLD_DIR / '_manifest.json'} o corre primero: python src/edp.py gold
     """).strip())
 
 print(f"✅ Parquet encontrados ({len(files)}):")
@@ -108,21 +109,30 @@ df_corr_subject = con.execute(sql_corr_by_subject).fetchdf()
 df_pct = con.execute(sql_percentiles).fetchdf()
 df_rank = con.execute(sql_ranking).fetchdf()
 
-# Guardar CSV consolidado
+# Secciones columnares (Arrow IPC + Parquet), una por KPI
+section_dfs = {
+    "avg_g3_by_school_subject": df_avg,
+    "corr_overall": df_corr_overall,
+    "corr_by_subject": df_corr_subject,
+    "percentiles_g3": df_pct,
+    "top10_g3_by_subject": df_rank,
+}
+section_entries = write_sections(REPORTS_DIR, ts, {
+    name: pa.Table.from_pandas(df, preserve_index=False) for name, df in section_dfs.items()
+})
+
+# CSV consolidado (opcional)
 def add_section(df, name):
     out = df.copy()
     out.insert(0, "section", name)
     return out
 
-csv_union = pd.concat([
-    add_section(df_avg, "avg_g3_by_school_subject"),
-    add_section(df_corr_overall, "corr_overall"),
-    add_section(df_corr_subject, "corr_by_subject"),
-    add_section(df_pct, "percentiles_g3"),
-    add_section(df_rank, "top10_g3_by_subject"),
-], ignore_index=True)
-
-csv_union.to_csv(csv_path, index=False, encoding="utf-8")
+if WRITE_WIDE_CSV:
+    csv_union = pd.concat(
+        [add_section(df, name) for name, df in section_dfs.items()],
+        ignore_index=True,
+    )
+    csv_union.to_csv(csv_path, index=False, encoding="utf-8")
 
 # Figuras (matplotlib, sin estilos específicos)
 # 1) Barras: promedio G3 por school/subject
@@ -168,6 +178,28 @@ html = "\n".join(html_parts)
 with open(html_path, "w", encoding="utf-8") as f:
     f.write(html)
 
+# Manifest del run: secciones (filas/esquema/rutas) + artefactos
+artifacts = {
+    "html": html_path.name,
+    "fig_avg": fig1_path.name,
+    "fig_box": fig2_path.name,
+}
+if WRITE_WIDE_CSV:
+    artifacts["csv"] = csv_path.name
+manifest = write_manifest(REPORTS_DIR, ts, section_entries, artifacts)
+
+# Índice de runs (latest en O(1)) + retención
+register_run(REPORTS_DIR, ts, {
+    **artifacts,
+    "manifest": manifest.name,
+    "sections": f"sections_{ts}",
+})
+pruned = apply_retention(REPORTS_DIR, KEEP_RUNS, RETENTION_MODE)
+
 print("OK")
-print(f"CSV  → {csv_path}")
+if WRITE_WIDE_CSV:
+    print(f"CSV  → {csv_path}")
+print(f"MANIFEST → {manifest}")
+if pruned:
+    print(f"Retención ({RETENTION_MODE}): {len(pruned)} runs antiguos")
 print(f"HTML → {html_path}")
@@ -1,16 +1,16 @@
 import os
-from glob import glob
 from datetime import datetime
 
 import duckdb
 import pandas as pd
+from gold_store import gold_files
 
 DATA_GOLD = "data/gold"
 REPORTS_DIR = "data/reports"
 
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
-parquet_files = glob(os.path.join(DATA_GOLD, "*.parquet"))
+parquet_files = gold_files(DATA_GOLD)
 if not parquet_files:
     raise FileNotFoundError(
         "No se encontraron archivos .parquet en '" + DATA_GOLD + "'. "
@@ -18,6 +18,7 @@ if not parquet_files:
     )
 
 con = duckdb.connect(database=':memory:')
+con.register("gold", con.read_parquet(parquet_files))
 ts = datetime.now().strftime("%Y%m%d_%H%M")
 
 def save(df: pd.DataFrame, stem: str):
@@ -34,7 +35,7 @@ kpi_avg = con.execute(
         ROUND(AVG(G3), 2)   AS avg_final,
         COUNT(*)            AS total_students,
         ROUND(STDDEV(G3),2) AS stddev_final
-    FROM read_parquet('data/gold/*.parquet')
+    FROM gold
     GROUP BY school, subject
     ORDER BY avg_final DESC
     """
@@ -47,7 +48,7 @@ kpi_corr = con.execute(
         corr(G1, G3) AS corr_g1_g3,
         corr(G2, G3) AS corr_g2_g3,
         corr(G1, G2) AS corr_g1_g2
-    FROM read_parquet('data/gold/*.parquet')
+    FROM gold
     """
 ).df()
 save(kpi_corr, "kpi_corr")
@@ -60,7 +61,7 @@ kpi_pct = con.execute(
         quantile_cont(G3, 0.50) AS p50,
         quantile_cont(G3, 0.90) AS p90,
         COUNT(*)                AS n
-    FROM read_parquet('data/gold/*.parquet')
+    FROM gold
     GROUP BY subject
     ORDER BY subject
     """
@@ -0,0 +1,207 @@
+# src/report_store.py
+# -*- coding: utf-8 -*-
+"""
+Salidas columnares del reporte diario.
+
+Cada sección KPI se guarda por separado (Arrow IPC + Parquet) en
+reports/sections_<ts>/ y se describe en reports/report_manifest_<ts>.json
+(filas, esquema y rutas). Así la validación lee tipos reales sin re-parsear
+el CSV ancho.
+
+reports/index.json indexa los artefactos de cada run por ts; "latest" se
+resuelve desde ahí sin escanear el directorio. Toda modificación del índice
+(registrar run, agregar artefacto, retención) se hace bajo reports/index.json.lock
+para que procesos concurrentes (reportes y validación) no se pisen entradas.
+"""
+import json, os, pathlib, re, shutil, time
+from contextlib import contextmanager
+# pyarrow se importa dentro de las funciones que lo usan: el índice de runs
+# (validate / flow) no debe pagar su tiempo de import.
+
+def sections_dir(reports_dir: pathlib.Path, ts: str) -> pathlib.Path:
+    return reports_dir / f"sections_{ts}"
+
+def manifest_path(reports_dir: pathlib.Path, ts: str) -> pathlib.Path:
+    return reports_dir / f"report_manifest_{ts}.json"
+
+def schema_of(tbl: "pa.Table") -> list:
+    return [{"name": f.name, "type": str(f.type)} for f in tbl.schema]
+
+def write_sections(reports_dir: pathlib.Path, ts: str, sections: dict) -> dict:
+    """Escribe cada sección (nombre -> pa.Table) y devuelve sus entradas de manifest."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    out_dir = sections_dir(reports_dir, ts)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    for name, tbl in sections.items():
+        files = {}
+        # Arrow IPC sin compresión: se puede abrir con memory-map (cero copias)
+        arrow_path = out_dir / f"{name}.arrow"
+        with pa.OSFile(str(arrow_path), "wb") as sink:
+            with ipc.new_file(sink, tbl.schema) as writer:
+                writer.write_table(tbl)
+        files["arrow"] = arrow_path.relative_to(reports_dir).as_posix()
+        # Parquet: consultable con DuckDB / SQL
+        pq_path = out_dir / f"{name}.parquet"
+        pq.write_table(tbl, pq_path)
+        files["parquet"] = pq_path.relative_to(reports_dir).as_posix()
+        entries[name] = {"rows": tbl.num_rows, "schema": schema_of(tbl), "files": files}
+    return entries
+
+def _write_json(path: pathlib.Path, doc: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def write_manifest(reports_dir: pathlib.Path, ts: str, sections: dict, artifacts: dict) -> pathlib.Path:
+    """Escribe el manifest del run de forma atómica (tmp + replace)."""
+    path = manifest_path(reports_dir, ts)
+    _write_json(path, {"ts": ts, "sections": sections, "artifacts": artifacts})
+    return path
+
+def read_manifest(path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def read_section(reports_dir: pathlib.Path, entry: dict) -> "pa.Table":
+    """Lee una sección: Arrow IPC vía memory-map si existe, si no Parquet."""
+    files = entry.get("files", {})
+    if "arrow" in files and (reports_dir / files["arrow"]).exists():
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        source = pa.memory_map(str(reports_dir / files["arrow"]), "r")
+        return ipc.open_file(source).read_all()
+    if "parquet" in files:
+        import pyarrow.parquet as pq
+        return pq.read_table(reports_dir / files["parquet"], memory_map=True)
+    raise FileNotFoundError(f"Sección sin archivos legibles: {entry}")
+
+# =======================
+# Índice de runs + retención
+# =======================
+INDEX_NAME = "index.json"
+LOCK_NAME = "index.json.lock"
+LOCK_STALE_S = 60  # un lock más viejo que esto es de un proceso que murió
+ARCHIVE_DIR = "archive"
+TS_RE = re.compile(r"_(\d{8}_\d{6})(?:\.\w+)?$")
+
+@contextmanager
+def index_lock(reports_dir: pathlib.Path):
+    """Lock de archivo (creación exclusiva) alrededor de un read-modify-write del índice."""
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    path = reports_dir / LOCK_NAME
+    deadline = time.monotonic() + 2 * LOCK_STALE_S
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > LOCK_STALE_S:
+                    path.unlink()  # lock huérfano
+                    continue
+            except FileNotFoundError:
+                continue  # se liberó entre el open y el stat
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No se pudo tomar {path} (¿otro proceso colgado?)")
+            time.sleep(0.05)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        path.unlink(missing_ok=True)
+
+def read_index(reports_dir: pathlib.Path) -> dict:
+    path = reports_dir / INDEX_NAME
+    if not path.exists():
+        return {"latest": None, "runs": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def rebuild_index(reports_dir: pathlib.Path) -> dict:
+    """Reconstruye el índice escaneando reports/ una sola vez (runs previos al índice)."""
+    with index_lock(reports_dir):
+        return _rebuild_index(reports_dir)
+
+def _rebuild_index(reports_dir: pathlib.Path) -> dict:
+    runs = {}
+    keys = {
+        "report_manifest_": "manifest",
+        "report_daily_": None,  # csv / html según extensión
+        "fig_avg_": "fig_avg",
+        "fig_box_": "fig_box",
+        "sections_": "sections",
+        "validation_": "validation",
+    }
+    for p in reports_dir.iterdir() if reports_dir.exists() else []:
+        m = TS_RE.search(p.name)
+        if not m:
+            continue
+        for prefix, key in keys.items():
+            if p.name.startswith(prefix):
+                key = key or p.suffix.lstrip(".")
+                runs.setdefault(m.group(1), {})[key] = p.name
+                break
+    index = {"latest": max(runs) if runs else None, "runs": dict(sorted(runs.items()))}
+    _write_json(reports_dir / INDEX_NAME, index)
+    return index
+
+def register_run(reports_dir: pathlib.Path, ts: str, artifacts: dict) -> dict:
+    """Agrega el run al índice y lo marca como último."""
+    with index_lock(reports_dir):
+        if not (reports_dir / INDEX_NAME).exists():
+            _rebuild_index(reports_dir)  # incorpora runs previos al índice
+        index = read_index(reports_dir)
+        index["runs"].setdefault(ts, {}).update(artifacts)
+        index["latest"] = max(index["runs"])
+        _write_json(reports_dir / INDEX_NAME, index)
+    return index
+
+def latest_run(reports_dir: pathlib.Path):
+    """Artefactos del último run (ts, dict) desde el índice, sin globs."""
+    if not (reports_dir / INDEX_NAME).exists():
+        with index_lock(reports_dir):
+            if not (reports_dir / INDEX_NAME).exists():
+                _rebuild_index(reports_dir)
+    index = read_index(reports_dir)
+    ts = index.get("latest")
+    if not ts:
+        return None, {}
+    return ts, index["runs"].get(ts, {})
+
+def apply_retention(reports_dir: pathlib.Path, keep: int, mode: str = "archive") -> list:
+    """
+    Conserva los `keep` runs más recientes del índice.
+    mode="archive" mueve los artefactos a reports/archive/<ts>/, mode="delete" los borra.
+    """
+    with index_lock(reports_dir):
+        index = read_index(reports_dir)
+        old = sorted(index["runs"])[:-keep] if keep > 0 else []
+        for ts in old:
+            for name in index["runs"][ts].values():
+                src = reports_dir / name
+                if not src.exists():
+                    continue
+                if mode == "delete" and src.is_dir():
+                    shutil.rmtree(src)
+                elif mode == "delete":
+                    src.unlink()
+                else:
+                    dst = reports_dir / ARCHIVE_DIR / ts
+                    dst.mkdir(parents=True, exist_ok=True)
+                    shutil.move(str(src), str(dst / name))
+            del index["runs"][ts]
+        if old:
+            _write_json(reports_dir / INDEX_NAME, index)
+    return old
+
+def add_artifact(reports_dir: pathlib.Path, ts: str, key: str, name: str) -> None:
+    """Agrega un artefacto (p. ej. la validación) a un run ya indexado."""
+    with index_lock(reports_dir):
+        index = read_index(reports_dir)
+        index["runs"].setdefault(ts, {})[key] = name
+        _write_json(reports_dir / INDEX_NAME, index)
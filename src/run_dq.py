@@ -2,8 +2,9 @@
 # -*- coding: utf-8 -*-
 import os, pathlib, textwrap, hashlib
 from datetime import datetime
-import duckdb
 import pandas as pd
+import pyarrow.parquet as pq
+from gold_store import gold_files
 
 # === CONFIGURACIÓN ===
 ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -19,19 +20,65 @@ FAIL_PATH = LOG_DIR / f"dq_failures_{RUN_TS}.csv"
 THRESHOLD_FAIL_RATIO = 0.02  # 2 %
 ENABLE_UNIQUENESS = os.getenv("DQ_ENABLE_UNIQUENESS", "0") == "1"
 ID_COLS = ["school","sex","age","subject","G1","G2","G3","absences"]  # si se usa unicidad
+# Short-circuit por estadísticas Parquet (min/max/null_count por row group); DQ_STATS_SKIP=0 fuerza escaneo completo
+STATS_SKIP = os.getenv("DQ_STATS_SKIP", "1") == "1"
+
+# Reglas verificables con el footer Parquet: columna -> (mín, máx) permitidos (None = sin cota).
+# Todas fallan con nulos, así que además exigen null_count == 0. Deben reflejar la sección 2.
+STAT_RULES = {
+    "school": (None, None),    # not_null_school
+    "subject": (None, None),   # not_null_subject
+    "G1": (0, 20),             # range_G1_0_20
+    "G2": (0, 20),             # range_G2_0_20
+    "G3": (0, 20),             # range_G3_0_20
+    "absences": (0, None),     # absences_ge_0
+    "age": (10, 30),           # age_between_10_30
+}
+
+def row_group_passes(rg_meta, col_index) -> bool:
+    """True si las estadísticas del row group prueban que TODAS las reglas pasan."""
+    for col, (lo, hi) in STAT_RULES.items():
+        if col not in col_index:
+            return False
+        stats = rg_meta.column(col_index[col]).statistics
+        if stats is None or not stats.has_null_count or stats.null_count > 0:
+            return False
+        if lo is None and hi is None:
+            continue
+        if not stats.has_min_max:
+            return False
+        if (lo is not None and stats.min < lo) or (hi is not None and stats.max > hi):
+            return False
+    return True
 
 # === 1) CARGA DEL GOLD ===
-parquets = [str(p) for p in GOLD_DIR.rglob("*.parquet")]
+parquets = gold_files(GOLD_DIR)
 if not parquets:
     raise FileNotFoundError(f"No hay archivos Parquet en {GOLD_DIR}")
 
-con = duckdb.connect()
-rel = con.read_parquet(parquets)
-con.register("gold", rel)
-df = con.execute("SELECT * FROM gold").fetchdf()
-total_rows = len(df)
+# Solo se leen los row groups que podrían tener violaciones (la unicidad exige leer todo)
+frames = []
+total_rows = 0
+rg_total = rg_scanned = 0
+for path in parquets:
+    pf = pq.ParquetFile(path)
+    meta = pf.metadata
+    col_index = {meta.schema.column(i).name: i for i in range(meta.num_columns)}
+    total_rows += meta.num_rows
+    to_scan = [
+        i for i in range(meta.num_row_groups)
+        if ENABLE_UNIQUENESS or not STATS_SKIP or not row_group_passes(meta.row_group(i), col_index)
+    ]
+    rg_total += meta.num_row_groups
+    rg_scanned += len(to_scan)
+    if to_scan:
+        frames.append(pf.read_row_groups(to_scan).to_pandas())
+    elif not frames:
+        frames.append(pf.schema_arrow.empty_table().to_pandas())
+
 if total_rows == 0:
     raise RuntimeError("El dataset Gold está vacío.")
+df = pd.concat(frames, ignore_index=True)
 
 # === 2) REGLAS DE CALIDAD ===
 checks = {}
@@ -116,6 +163,7 @@ print(textwrap.dedent(f"""
 DQ RUN
 ------
 Rows totales     : {total_rows}
+Row groups       : {rg_scanned}/{rg_total} escaneados (resto probado por estadísticas)
 Filas con fallos : {failed_rows}
 Ratio de fallos  : {fail_ratio:.4%}
 Umbral (FAIL)    : {THRESHOLD_FAIL_RATIO:.2%}
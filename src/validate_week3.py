@@ -1,104 +1,173 @@
 # src/validate_week3.py
 # -*- coding: utf-8 -*-
-import os, pathlib, glob, sys
-import pandas as pd
+import os, pathlib, sys, json
+from datetime import datetime
+import duckdb
+from report_store import read_manifest, read_section, latest_run, add_artifact
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 REPORTS = ROOT / "reports"
 
-def latest(path, pattern):
-    files = sorted(glob.glob(str(path / pattern)))
-    return files[-1] if files else None
-
-def ok(flag): return "PASS" if flag else "FAIL"
-
-def main():
-    # 1) Artefactos
-    csv_latest  = latest(REPORTS, "report_daily_*.csv")
-    html_latest = latest(REPORTS, "report_daily_*.html")
-    png_avg     = latest(REPORTS, "fig_avg_*.png")
-    png_box     = latest(REPORTS, "fig_box_*.png")
-
-    print("=== Semana 3 • Validación ===")
-    print(f"- CSV encontrado : {bool(csv_latest)} -> {csv_latest}")
-    print(f"- HTML encontrado: {bool(html_latest)} -> {html_latest}")
-    print(f"- PNG avg        : {bool(png_avg)} -> {png_avg}")
-    print(f"- PNG box        : {bool(png_box)} -> {png_box}")
-
-    art_ok = all([csv_latest, html_latest, png_avg, png_box])
-
-    # 2) Secciones y checks de contenido (si hay CSV)
-    sections_ok = False
-    avg_ok = corr_ok = pct_ok = rank_ok = False
-    subjects_ok = False
-    monotonic_ok = False
-
-    if csv_latest:
-        df = pd.read_csv(csv_latest)
-        if "section" not in df.columns:
-            print("FAIL: CSV no trae columna 'section'.")
-            sys.exit(1)
-
-        needed = {
-            "avg_g3_by_school_subject",
-            "corr_overall",
-            "corr_by_subject",
-            "percentiles_g3",
-            "top10_g3_by_subject",
-        }
-        present = set(df["section"].unique())
-        sections_ok = needed.issubset(present)
-        print(f"- Secciones en CSV: {present}  -> {ok(sections_ok)}")
-
-        # avg
-        try:
-            avg_df = df[df["section"]=="avg_g3_by_school_subject"][["school","subject","avg_g3","n"]]
-            avg_ok = (len(avg_df)>0) and avg_df["n"].gt(0).all() and avg_df["avg_g3"].notna().all()
-            # subjects
-            subjects_ok = set(avg_df["subject"].unique()) >= {"Math","Portuguese"}
-        except Exception:
-            avg_ok = False
-
-        # corr
-        try:
-            corr_overall = df[df["section"]=="corr_overall"]["corr_g1_g3_overall"].astype(float)
-            corr_by_subj = df[df["section"]=="corr_by_subject"][["subject","corr_g1_g3"]].dropna()
-            corr_ok = (
-                (len(corr_overall)==1) and
-                corr_overall.between(-1,1).all() and
-                (len(corr_by_subj)>=2) and
-                corr_by_subj["corr_g1_g3"].astype(float).between(-1,1).all()
-            )
-        except Exception:
-            corr_ok = False
-
-        # percentiles
+# Fuente de las secciones: "parquet" (SQL directo de DuckDB, por defecto: no carga pyarrow)
+# o "arrow" (Arrow IPC memory-mapped, registrado en DuckDB)
+VALIDATE_SOURCE = os.getenv("VALIDATE_SOURCE", "parquet")
+
+NEEDED_SECTIONS = {
+    "avg_g3_by_school_subject",
+    "corr_overall",
+    "corr_by_subject",
+    "percentiles_g3",
+    "top10_g3_by_subject",
+}
+
+# =======================
+# Checks (SQL, en lote)
+# =======================
+# (nombre, sección, predicado por fila, condición agregada)
+# - predicado por fila: las filas donde es FALSE cuentan como violaciones (NULL = no evaluable)
+# - condición agregada: debe ser TRUE sobre la sección completa
+CHECKS = [
+    ("avg_g3", "avg_g3_by_school_subject",
+     "n > 0 AND avg_g3 IS NOT NULL", "count(*) > 0"),
+    ("subjects_math_portuguese", "avg_g3_by_school_subject",
+     None, "list_has_all(list(DISTINCT subject), ['Math', 'Portuguese'])"),
+    ("corr_overall", "corr_overall",
+     "corr_g1_g3_overall IS NOT NULL AND corr_g1_g3_overall BETWEEN -1 AND 1", "count(*) = 1"),
+    ("corr_by_subject", "corr_by_subject",
+     "corr_g1_g3 BETWEEN -1 AND 1", "count(corr_g1_g3) >= 2"),
+    ("percentiles_monotonic", "percentiles_g3",
+     "p10 <= p25 AND p25 <= p50 AND p50 <= p75 AND p75 <= p90", "count(p10) >= 2"),
+    ("ranking_top10", "top10_g3_by_subject",
+     "rk BETWEEN 1 AND 10", "count(*) > 0"),
+]
+
+def check_sql(name, section, row_pred, agg_cond):
+    violations = f"count(*) FILTER (WHERE NOT ({row_pred}))" if row_pred else "0"
+    return (
+        f"SELECT '{name}' AS name, '{section}' AS section, count(*) AS rows, "
+        f"{violations} AS violations, coalesce({agg_cond}, false) AS agg_ok "
+        f'FROM "{section}"'
+    )
+
+def artifact(run, key):
+    """Ruta absoluta de un artefacto del run (según reports/index.json) o None."""
+    name = run.get(key)
+    return str(REPORTS / name) if name and (REPORTS / name).exists() else None
+
+def register_sections(con, manifest_file):
+    """Vistas por sección: Arrow IPC memory-mapped (zero-copy) o Parquet vía read_parquet."""
+    manifest = read_manifest(manifest_file)
+    for name, entry in manifest["sections"].items():
+        pq_file = entry.get("files", {}).get("parquet")
+        if VALIDATE_SOURCE == "parquet" and pq_file:
+            path = (REPORTS / pq_file).as_posix().replace("'", "''")
+            con.execute(f"CREATE VIEW \"{name}\" AS SELECT * FROM read_parquet('{path}')")
+        else:
+            con.register(name, read_section(REPORTS, entry))
+    return set(manifest["sections"])
+
+def register_sections_csv(con, csv_file):
+    """Fallback legacy: un solo groupby sobre 'section' del CSV ancho."""
+    import pandas as pd  # solo para runs legacy sin manifest
+    df = pd.read_csv(csv_file)
+    if "section" not in df.columns:
+        raise ValueError("CSV no trae columna 'section'.")
+    for name, g in df.groupby("section", sort=False):
+        con.register(name, g.drop(columns="section").reset_index(drop=True))
+    return set(df["section"].unique())
+
+def run_checks(con, present):
+    """Ejecuta todos los checks en una sola consulta; si falla, uno a uno para aislar errores."""
+    runnable = [c for c in CHECKS if c[1] in present]
+    results = {
+        c[0]: {"name": c[0], "section": c[1], "ok": False, "error": "sección ausente"}
+        for c in CHECKS if c[1] not in present
+    }
+    rows = []
+    if runnable:
         try:
-            pct_df = df[df["section"]=="percentiles_g3"][["subject","p10","p25","p50","p75","p90"]].dropna()
-            def mono(row): return row["p10"]<=row["p25"]<=row["p50"]<=row["p75"]<=row["p90"]
-            monotonic_ok = pct_df.apply(mono, axis=1).all() and (len(pct_df)>=2)
-            pct_ok = monotonic_ok
-        except Exception:
-            pct_ok = False
+            rows = con.execute(" UNION ALL ".join(check_sql(*c) for c in runnable)).fetchall()
+        except duckdb.Error:
+            for c in runnable:
+                try:
+                    rows.extend(con.execute(check_sql(*c)).fetchall())
+                except duckdb.Error as e:
+                    results[c[0]] = {"name": c[0], "section": c[1], "ok": False, "error": str(e).splitlines()[0]}
+    for name, section, n_rows, violations, agg_ok in rows:
+        results[name] = {
+            "name": name,
+            "section": section,
+            "ok": bool(agg_ok) and violations == 0,
+            "rows": int(n_rows),
+            "violations": int(violations),
+        }
+    return [results[c[0]] for c in CHECKS]
 
-        # ranking
+def main():
+    # 1) Artefactos (último run según el índice)
+    run_ts, run = latest_run(REPORTS)
+    artifacts = {
+        "manifest": artifact(run, "manifest"),
+        "csv": artifact(run, "csv"),
+        "html": artifact(run, "html"),
+        "fig_avg": artifact(run, "fig_avg"),
+        "fig_box": artifact(run, "fig_box"),
+    }
+    data_latest = artifacts["manifest"] or artifacts["csv"]
+    checks = [{
+        "name": "artifacts",
+        "ok": all([data_latest, artifacts["html"], artifacts["fig_avg"], artifacts["fig_box"]]),
+    }]
+
+    # 2) Secciones + checks de contenido (manifest columnar; CSV ancho como fallback)
+    present = set()
+    source = None
+    if data_latest:
+        con = duckdb.connect()
         try:
-            rank_df = df[df["section"]=="top10_g3_by_subject"].copy()
-            rank_ok = (len(rank_df)>0) and rank_df["rk"].between(1,10).all()
-        except Exception:
-            rank_ok = False
-
-    # Resumen
-    print(f"- Artefactos (CSV/HTML/PNGs): {ok(art_ok)}")
-    print(f"- Secciones requeridas       : {ok(sections_ok)}")
-    print(f"- AVG G3                     : {ok(avg_ok)}")
-    print(f"- Subjects (Math/Portuguese) : {ok(subjects_ok)}")
-    print(f"- CORR (global/subject)      : {ok(corr_ok)}")
-    print(f"- Percentiles monótonos      : {ok(pct_ok)}")
-    print(f"- Ranking top10 (rk 1..10)   : {ok(rank_ok)}")
-
-    all_ok = all([art_ok, sections_ok, avg_ok, subjects_ok, corr_ok, pct_ok, rank_ok])
-    print("\n>>> Semana 3:", "COMPLETA ✅" if all_ok else "INCOMPLETA ❌")
+            if artifacts["manifest"]:
+                source = VALIDATE_SOURCE
+                present = register_sections(con, artifacts["manifest"])
+            else:
+                source = "csv"
+                present = register_sections_csv(con, artifacts["csv"])
+        except ValueError as e:
+            print(f"FAIL: {e}")
+            sys.exit(1)
+        checks.append({
+            "name": "sections",
+            "ok": NEEDED_SECTIONS.issubset(present),
+            "missing": sorted(NEEDED_SECTIONS - present),
+        })
+        checks.extend(run_checks(con, present))
+        con.close()
+    else:
+        checks.append({"name": "sections", "ok": False, "missing": sorted(NEEDED_SECTIONS)})
+        checks.extend({"name": c[0], "section": c[1], "ok": False, "error": "sin datos"} for c in CHECKS)
+
+    # 3) Reporte estructurado (JSON)
+    all_ok = all(c["ok"] for c in checks)
+    report = {
+        "run_ts": run_ts,
+        "validated_at": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "source": source,
+        "status": "PASS" if all_ok else "FAIL",
+        "artifacts": artifacts,
+        "sections": sorted(present),
+        "checks": checks,
+    }
+    out_name = f"validation_{run_ts or 'none'}.json"
+    out_path = REPORTS / out_name
+    REPORTS.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    if run_ts:
+        add_artifact(REPORTS, run_ts, "validation", out_name)
+
+    failed = [c["name"] for c in checks if not c["ok"]]
+    print(f"Validación Semana 3 ({run_ts}): {report['status']}"
+          + (f" — fallan: {', '.join(failed)}" if failed else ""))
+    print(f"Reporte → {out_path}")
     sys.exit(0 if all_ok else 2)
 
 if __name__ == "__main__":